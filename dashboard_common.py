@@ -0,0 +1,124 @@
+# Shared helpers for indian_dashboard.py and indian_dashboard_advanced.py
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Optional JIT compilation for the SMA/signal kernel (falls back to numpy).
+# Living in an imported module, the compiled kernel is built once per process
+# rather than on every Streamlit script rerun.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+# Compact column types for fetched bars (INR prices fit easily in float32)
+BAR_DTYPES = {"Open": np.float32, "High": np.float32, "Low": np.float32,
+              "Close": np.float32, "Volume": np.int32}
+
+# Helper Function - Downcast fetched bars to BAR_DTYPES
+def compact_bars(data):
+    # Yahoo sometimes leaves Volume blank on a valid bar; int32 can't hold NaN
+    return data.fillna({"Volume": 0}).astype(BAR_DTYPES)
+
+# Helper Function - Append fresh bars (replacing the still-forming last one) and trim to the window
+def merge_bars(hist, tail, period_days):
+    if tail.empty:
+        return hist
+    hist = pd.concat([hist, tail])
+    hist = hist[~hist.index.duplicated(keep="last")]
+    return hist[hist.index > hist.index[-1] - pd.Timedelta(days=period_days)]
+
+# Helper Function - Per-symbol bar history in session state, limited to the watched symbols
+def session_history(period_days, symbols):
+    history = st.session_state.setdefault("history", {})
+    if st.session_state.get("history_days") != period_days:
+        history.clear()
+        st.session_state["history_days"] = period_days
+    # Forget symbols that are no longer watched
+    for stale in set(history) - set(symbols):
+        del history[stale]
+    return history
+
+# Helper Function - Simple Moving Average (cumulative sum, O(n))
+def sma(arr, w):
+    out = np.full(len(arr), np.nan)
+    if w <= len(arr):
+        # Accumulate in float64 so long float32 series don't drift
+        csum = np.cumsum(arr, dtype=np.float64)
+        out[w - 1:] = (csum[w - 1:] - np.concatenate(([0], csum[:-w]))) / w
+    return out
+
+# Helper Function - Short/long SMAs and crossover signal (+1 / -1, 0 while warming up)
+if NUMBA_AVAILABLE:
+    # One fused pass, keeping running sums of both windows
+    @njit(cache=True)
+    def sma_signal(close, w_short, w_long):
+        n = len(close)
+        sma_short = np.full(n, np.nan)
+        sma_long = np.full(n, np.nan)
+        signal = np.zeros(n, dtype=np.int8)
+        sum_short = 0.0
+        sum_long = 0.0
+        for i in range(n):
+            sum_short += close[i]
+            sum_long += close[i]
+            if i >= w_short:
+                sum_short -= close[i - w_short]
+            if i >= w_long:
+                sum_long -= close[i - w_long]
+            if i >= w_short - 1:
+                sma_short[i] = sum_short / w_short
+            if i >= w_long - 1:
+                sma_long[i] = sum_long / w_long
+            if i >= w_short - 1 and i >= w_long - 1:
+                if sma_short[i] > sma_long[i]:
+                    signal[i] = 1
+                elif sma_short[i] < sma_long[i]:
+                    signal[i] = -1
+        return sma_short, sma_long, signal
+else:
+    def sma_signal(close, w_short, w_long):
+        sma_short = sma(close, w_short)
+        sma_long = sma(close, w_long)
+        return sma_short, sma_long, np.nan_to_num(np.sign(sma_short - sma_long)).astype(np.int8)
+
+# Helper Function - Display text for a signal value
+def signal_label(signal):
+    return "BUY 🟢" if signal == 1 else "SELL 🔴"
+
+# Helper Function - Chart x values as datetime64 in exchange-local time
+def chart_x(index):
+    # .values on a tz-aware index would shift the timestamps to UTC
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return index.values
+
+# Helper Function - Trace data (candles, SMAs, markers) in figure trace order
+def chart_traces(data, show_signals):
+    # Plain numpy arrays let Plotly serialize buffers directly instead of iterating Series
+    x = chart_x(data.index)
+    traces = [
+        dict(x=x,
+             open=data["Open"].to_numpy(copy=False),
+             high=data["High"].to_numpy(copy=False),
+             low=data["Low"].to_numpy(copy=False),
+             close=data["Close"].to_numpy(copy=False)),
+        dict(x=x, y=data["SMA_short"].to_numpy(copy=False)),
+        dict(x=x, y=data["SMA_long"].to_numpy(copy=False)),
+    ]
+    if show_signals:
+        # Mark crossovers only: -1 -> +1 is a BUY, +1 -> -1 is a SELL
+        change = np.diff(data["Signal"].to_numpy(), prepend=0)
+        buy_idx = np.flatnonzero(change == 2)
+        sell_idx = np.flatnonzero(change == -2)
+        close = data["Close"].to_numpy(copy=False)
+        traces.append(dict(x=x[buy_idx], y=close[buy_idx]))
+        traces.append(dict(x=x[sell_idx], y=close[sell_idx]))
+    return traces
+
+# Helper Function - Swap new trace data into an existing figure, keeping its layout
+def update_traces(fig, traces):
+    with fig.batch_update():
+        for trace, values in zip(fig.data, traces):
+            trace.update(values)
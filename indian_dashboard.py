@@ -2,7 +2,8 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
-import time
+from dashboard_common import (compact_bars, merge_bars, session_history, sma_signal,
+                              signal_label, chart_traces, update_traces)
 
 # Page settings
 st.set_page_config(page_title="🇮🇳 Live Indian Stock Dashboard", layout="wide")
@@ -18,31 +19,97 @@ ma_short = st.sidebar.number_input("Short MA", 5, 50, 10)
 ma_long = st.sidebar.number_input("Long MA", 10, 200, 50)
 show_signals = st.sidebar.checkbox("Show BUY/SELL markers", True)
 
-chart_placeholder = st.empty()
-status_placeholder = st.empty()
+# Cached data fetch - the TTL sits just under refresh_sec so each refresh tick gets fresh bars
+@st.cache_data(ttl=refresh_sec - 5, show_spinner=False)
+def fetch_bars(symbol, period_days, interval):
+    ticker = yf.Ticker(symbol)
+    data = ticker.history(period=f"{period_days}d", interval=interval)
+    if data.empty:
+        return data
+    return compact_bars(data)
+
+# Helper Function - Bar history kept in session state; after the first load only the last 2 days are fetched
+def load_history(symbol):
+    history = session_history(period_days, (symbol,))
+
+    if symbol in history:
+        history[symbol] = merge_bars(history[symbol], fetch_bars(symbol, 2, "1h"), period_days)
+    else:
+        data = fetch_bars(symbol, period_days, "1h")
+        if data.empty:
+            return data
+        history[symbol] = data
+    return history[symbol].copy()
+
+# Helper Function - Build the chart once; later refreshes only swap trace data
+def build_chart(traces):
+    # Plot Candlestick chart
+    fig = go.Figure(data=[go.Candlestick(**traces[0], name="Candles")])
+
+    # Add moving averages
+    fig.add_trace(go.Scatter(
+        **traces[1],
+        mode="lines",
+        line=dict(color="green", width=1.5),
+        name=f"SMA{ma_short}"
+    ))
+    fig.add_trace(go.Scatter(
+        **traces[2],
+        mode="lines",
+        line=dict(color="red", width=1.5),
+        name=f"SMA{ma_long}"
+    ))
+
+    # Add buy/sell markers
+    if show_signals:
+        fig.add_trace(go.Scatter(
+            **traces[3],
+            mode="markers",
+            marker=dict(symbol="triangle-up", color="lime", size=10),
+            name="BUY"
+        ))
+        fig.add_trace(go.Scatter(
+            **traces[4],
+            mode="markers",
+            marker=dict(symbol="triangle-down", color="red", size=10),
+            name="SELL"
+        ))
+
+    # Layout customization
+    fig.update_layout(
+        title=f"{symbol} — Live NSE Candlestick Chart",
+        xaxis_title="Time",
+        yaxis_title="Price (INR)",
+        template="plotly_dark",
+        xaxis_rangeslider_visible=False,
+        height=600
+    )
+    return fig
+
+# Live refresh - Streamlit reruns this fragment every refresh_sec seconds
+@st.fragment(run_every=refresh_sec)
+def live_dashboard():
+    chart_placeholder = st.empty()
+    status_placeholder = st.empty()
 
-while True:
     try:
         # Fetch live NSE data
-        data = yf.download(symbol, period=f"{period_days}d", interval="1h", progress=False)
+        data = load_history(symbol)
 
         if data.empty:
             st.warning(f"No data found for {symbol}")
-            time.sleep(refresh_sec)
-            continue
+            return
 
-        # Calculate moving averages
-        data["SMA_short"] = data["Close"].rolling(window=ma_short).mean()
-        data["SMA_long"] = data["Close"].rolling(window=ma_long).mean()
+        # Calculate moving averages and buy/sell signals (+1 / -1, 0 while the MAs are warming up)
+        close = data["Close"].to_numpy(copy=False)
+        sma_short, sma_long, signal = sma_signal(close, int(ma_short), int(ma_long))
+        data["SMA_short"] = sma_short
+        data["SMA_long"] = sma_long
+        data["Signal"] = signal
 
-        # Generate buy/sell signals
-        data["Signal"] = 0
-        data.loc[data["SMA_short"] > data["SMA_long"], "Signal"] = 1
-        data.loc[data["SMA_short"] < data["SMA_long"], "Signal"] = -1
-
-        latest_signal = data["Signal"].iloc[-1]
-        status = "BUY 🟢" if latest_signal == 1 else "SELL 🔴"
-        latest_close = float(data["Close"].iloc[-1])
+        latest_signal = int(signal[-1])
+        status = signal_label(latest_signal)
+        latest_close = float(close[-1])
 
         # Display signal and price
         status_placeholder.metric(
@@ -51,67 +118,20 @@ while True:
             delta=f"₹ {latest_close:.2f}"
         )
 
-        # Plot Candlestick chart
-        fig = go.Figure(data=[go.Candlestick(
-            x=data.index,
-            open=data["Open"],
-            high=data["High"],
-            low=data["Low"],
-            close=data["Close"],
-            name="Candles"
-        )])
-
-        # Add moving averages
-        fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data["SMA_short"],
-            mode="lines",
-            line=dict(color="green", width=1.5),
-            name=f"SMA{ma_short}"
-        ))
-        fig.add_trace(go.Scatter(
-            x=data.index,
-            y=data["SMA_long"],
-            mode="lines",
-            line=dict(color="red", width=1.5),
-            name=f"SMA{ma_long}"
-        ))
+        # Reuse the session's chart; rebuild only when its layout changes
+        traces = chart_traces(data, show_signals)
+        chart_id = (symbol, ma_short, ma_long, show_signals)
+        fig = st.session_state.get("chart")
+        if fig is None or st.session_state.get("chart_id") != chart_id:
+            fig = build_chart(traces)
+            st.session_state["chart"] = fig
+            st.session_state["chart_id"] = chart_id
+        else:
+            update_traces(fig, traces)
 
-        # Add buy/sell markers
-        if show_signals:
-            buy_signals = data[data["Signal"] == 1]
-            sell_signals = data[data["Signal"] == -1]
-
-            fig.add_trace(go.Scatter(
-                x=buy_signals.index,
-                y=buy_signals["Close"],
-                mode="markers",
-                marker=dict(symbol="triangle-up", color="lime", size=10),
-                name="BUY"
-            ))
-            fig.add_trace(go.Scatter(
-                x=sell_signals.index,
-                y=sell_signals["Close"],
-                mode="markers",
-                marker=dict(symbol="triangle-down", color="red", size=10),
-                name="SELL"
-            ))
-
-        # Layout customization
-        fig.update_layout(
-            title=f"{symbol} — Live NSE Candlestick Chart",
-            xaxis_title="Time",
-            yaxis_title="Price (INR)",
-            template="plotly_dark",
-            xaxis_rangeslider_visible=False,
-            height=600
-        )
-
-        chart_placeholder.plotly_chart(fig, use_container_width=True, key=time.time())
-
-        # Auto refresh
-        time.sleep(refresh_sec)
+        chart_placeholder.plotly_chart(fig, use_container_width=True, key="main_chart")
 
     except Exception as e:
         st.error(f"Error: {e}")
-        time.sleep(refresh_sec)
+
+live_dashboard()
@@ -1,9 +1,12 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import time
+from plotly.subplots import make_subplots
 from datetime import datetime
+from dashboard_common import (compact_bars, merge_bars, session_history, sma_signal,
+                              signal_label, chart_traces, update_traces)
 
 # Optional desktop notifications (work only on local desktop)
 try:
@@ -18,13 +21,18 @@ st.set_page_config(page_title="📱 Indian Stock Market Dashboard", layout="wide
 # Title
 st.markdown("<h2 style='text-align:center;'>📈 Indian Stock Live Dashboard (NSE)</h2>", unsafe_allow_html=True)
 
+# Helper Function - Parse the symbols input once per distinct value (tuple so it can key caches)
+@st.cache_data(show_spinner=False)
+def parse_symbols(symbols_input):
+    return tuple(s.strip().upper() for s in symbols_input.split(",") if s.strip())
+
 # Sidebar Settings
 st.sidebar.header("⚙️ Dashboard Settings")
 symbols_input = st.sidebar.text_input(
     "Enter NSE symbols (comma separated):",
     "RELIANCE.NS, TCS.NS, HDFCBANK.NS"
 )
-symbols = [s.strip().upper() for s in symbols_input.split(",") if s.strip()]
+symbols = parse_symbols(symbols_input)
 
 refresh_sec = st.sidebar.slider("Refresh interval (seconds)", 15, 300, 60)
 period_days = st.sidebar.slider("Days of data", 5, 180, 30)
@@ -32,108 +40,182 @@ ma_short = st.sidebar.number_input("Short MA (e.g., 10)", 5, 50, 10)
 ma_long = st.sidebar.number_input("Long MA (e.g., 50)", 10, 200, 50)
 show_signals = st.sidebar.checkbox("Show BUY/SELL markers", True)
 
-# Placeholder Layout
-signal_placeholder = st.empty()
-chart_placeholder = st.empty()
-
-# Helper Function - Plot Chart
-def plot_chart(data, symbol):
-    fig = go.Figure(data=[go.Candlestick(
-        x=data.index,
-        open=data["Open"],
-        high=data["High"],
-        low=data["Low"],
-        close=data["Close"],
-        name="Candlestick"
-    )])
-
-    fig.add_trace(go.Scatter(x=data.index, y=data["SMA_short"],
-                             mode="lines", line=dict(color="lime", width=1.5),
-                             name=f"SMA {ma_short}"))
-    fig.add_trace(go.Scatter(x=data.index, y=data["SMA_long"],
-                             mode="lines", line=dict(color="red", width=1.5),
-                             name=f"SMA {ma_long}"))
-
-    if show_signals:
-        buy_points = data[data["Signal"] == 1]
-        sell_points = data[data["Signal"] == -1]
-
-        fig.add_trace(go.Scatter(x=buy_points.index, y=buy_points["Close"],
-                                 mode="markers", marker=dict(symbol="triangle-up", color="lime", size=10), name="BUY"))
-        fig.add_trace(go.Scatter(x=sell_points.index, y=sell_points["Close"],
-                                 mode="markers", marker=dict(symbol="triangle-down", color="red", size=10), name="SELL"))
+# Cached batched fetch - the TTL sits just under refresh_sec so each refresh tick gets fresh bars
+@st.cache_data(ttl=refresh_sec - 5, show_spinner=False)
+def fetch_bars(symbols, period_days, interval):
+    # One request for all symbols (yfinance threads the downloads)
+    return yf.download(
+        tickers=list(symbols),
+        period=f"{period_days}d",
+        interval=interval,
+        group_by="ticker",
+        threads=min(8, len(symbols)),
+        progress=False
+    )
+
+# Helper Function - One ticker's bars from a batched download (empty if the symbol returned nothing)
+def ticker_bars(batch, symbol):
+    if symbol not in batch.columns.get_level_values(0):
+        return pd.DataFrame()
+    return compact_bars(batch[symbol].dropna(subset=["Close"]))
+
+# Helper Function - Bar history per symbol kept in session state; after the first load only the last 2 days are fetched
+def load_history(symbols):
+    history = session_history(period_days, symbols)
+
+    known = tuple(s for s in symbols if s in history)
+    missing = tuple(s for s in symbols if s not in history)
+    if known:
+        batch = fetch_bars(known, 2, "1h")
+        for symbol in known:
+            history[symbol] = merge_bars(history[symbol], ticker_bars(batch, symbol), period_days)
+    if missing:
+        batch = fetch_bars(missing, period_days, "1h")
+        for symbol in missing:
+            data = ticker_bars(batch, symbol)
+            if not data.empty:
+                history[symbol] = data
+    return {s: history[s].copy() for s in symbols if s in history}
+
+# Helper Function - Plot Chart (one subplot row per symbol)
+def build_chart(symbol_traces):
+    plotted = list(symbol_traces)
+    fig = make_subplots(rows=len(plotted), cols=1, shared_xaxes=True, subplot_titles=plotted)
+
+    for row, symbol in enumerate(plotted, start=1):
+        traces = symbol_traces[symbol]
+        # Legend entries from the first row toggle the same trace in every row
+        legend = dict(showlegend=row == 1)
+
+        fig.add_trace(go.Candlestick(**traces[0], name="Candlestick", legendgroup="candles", **legend),
+                      row=row, col=1)
+        fig.add_trace(go.Scatter(**traces[1],
+                                 mode="lines", line=dict(color="lime", width=1.5),
+                                 name=f"SMA {ma_short}", legendgroup="sma_short", **legend),
+                      row=row, col=1)
+        fig.add_trace(go.Scatter(**traces[2],
+                                 mode="lines", line=dict(color="red", width=1.5),
+                                 name=f"SMA {ma_long}", legendgroup="sma_long", **legend),
+                      row=row, col=1)
+
+        if show_signals:
+            fig.add_trace(go.Scatter(**traces[3],
+                                     mode="markers", marker=dict(symbol="triangle-up", color="lime", size=10),
+                                     name="BUY", legendgroup="buy", **legend),
+                          row=row, col=1)
+            fig.add_trace(go.Scatter(**traces[4],
+                                     mode="markers", marker=dict(symbol="triangle-down", color="red", size=10),
+                                     name="SELL", legendgroup="sell", **legend),
+                          row=row, col=1)
 
     fig.update_layout(
-        title=f"{symbol} — Live Chart",
+        title="Live Charts",
         template="plotly_dark",
-        xaxis_title="Time",
-        yaxis_title="Price (INR)",
-        xaxis_rangeslider_visible=False,
-        height=450
+        height=450 * len(plotted)
     )
+    fig.update_xaxes(rangeslider_visible=False)
+    fig.update_xaxes(title_text="Time", row=len(plotted), col=1)
+    fig.update_yaxes(title_text="Price (INR)")
     return fig
 
-# Track last signals to trigger notifications
-last_signal_status = {}
+# Helper Function - Reuse the session's chart; rebuild only when its layout changes
+def plot_chart(symbol_traces):
+    chart_id = (tuple(symbol_traces), ma_short, ma_long, show_signals)
+    fig = st.session_state.get("chart")
+    if fig is None or st.session_state.get("chart_id") != chart_id:
+        fig = build_chart(symbol_traces)
+        st.session_state["chart"] = fig
+        st.session_state["chart_id"] = chart_id
+    else:
+        traces = [values for symbol in symbol_traces for values in symbol_traces[symbol]]
+        update_traces(fig, traces)
+    return fig
 
-# Live Update Loop
-while True:
-    try:
-        summary_data = []
+# Live Update - Streamlit reruns this fragment every refresh_sec seconds
+@st.fragment(run_every=refresh_sec)
+def live_dashboard():
+    # Placeholder Layout
+    signal_placeholder = st.empty()
+    chart_placeholder = st.empty()
+
+    # Track last signals to trigger notifications (kept across reruns)
+    last_signal_status = st.session_state.setdefault("last_signal", {})
 
-        # If no symbols entered, pause and continue
+    try:
+        # If no symbols entered, wait for the next run
         if not symbols:
             st.warning("Please enter at least one symbol in the sidebar.")
-            time.sleep(5)
-            continue
+            return
+
+        bars = load_history(symbols)
+
+        # Signals table columns, filled per symbol
+        prices = np.full(len(symbols), np.nan, dtype=np.float32)
+        signals = np.zeros(len(symbols), dtype=np.int8)
+        has_data = np.zeros(len(symbols), dtype=bool)
+
+        # Symbols whose signal flipped this refresh: (symbol, signal text, price)
+        changed = []
+
+        # Chart trace data per plotted symbol, drawn as one figure after the loop
+        symbol_traces = {}
 
-        for symbol in symbols:
-            data = yf.download(symbol, period=f"{period_days}d", interval="1h", progress=False)
-            if data.empty:
+        for i, symbol in enumerate(symbols):
+            data = bars.get(symbol)
+            if data is None:
                 # show warning but continue with other symbols
                 st.warning(f"No data for {symbol} (maybe wrong symbol).")
                 continue
 
             # Calculate MAs & signals
-            data["SMA_short"] = data["Close"].rolling(ma_short).mean()
-            data["SMA_long"] = data["Close"].rolling(ma_long).mean()
-            data["Signal"] = 0
-            data.loc[data["SMA_short"] > data["SMA_long"], "Signal"] = 1
-            data.loc[data["SMA_short"] < data["SMA_long"], "Signal"] = -1
-
-            latest_signal = data["Signal"].iloc[-1]
-            latest_close = float(data["Close"].iloc[-1])
-            signal_text = "BUY 🟢" if latest_signal == 1 else "SELL 🔴"
-
-            summary_data.append({
-                "Stock": symbol,
-                "Price (₹)": f"{latest_close:.2f}",
-                "Signal": signal_text
-            })
-
-            # Desktop alert only on local machine if plyer available
-            if PLYER_AVAILABLE:
-                if symbol in last_signal_status and last_signal_status[symbol] != latest_signal:
-                    notification.notify(
-                        title=f"{symbol} Signal Changed!",
-                        message=f"New Signal: {signal_text} | Price ₹{latest_close:.2f}",
-                        timeout=5
-                    )
-
-            last_signal_status[symbol] = latest_signal
-
-            # Display chart for this symbol (unique key to avoid duplicate ID)
-            fig = plot_chart(data, symbol)
-            chart_placeholder.plotly_chart(fig, use_container_width=True, key=f"{symbol}-{time.time()}")
+            close = data["Close"].to_numpy(copy=False)
+            sma_short, sma_long, signal = sma_signal(close, int(ma_short), int(ma_long))
+            data["SMA_short"] = sma_short
+            data["SMA_long"] = sma_long
+            data["Signal"] = signal
+
+            latest_signal = int(signal[-1])
+            latest_close = float(close[-1])
+            signal_text = signal_label(latest_signal)
+
+            prices[i] = latest_close
+            signals[i] = latest_signal
+            has_data[i] = True
+
+            if symbol in last_signal_status and last_signal_status[symbol] != latest_signal:
+                changed.append((symbol, signal_text, latest_close))
+
+            last_signal_status[symbol] = np.int8(latest_signal)
+
+            symbol_traces[symbol] = chart_traces(data, show_signals)
+
+        # Display all symbols in a single chart
+        if symbol_traces:
+            fig = plot_chart(symbol_traces)
+            chart_placeholder.plotly_chart(fig, use_container_width=True, key="all_charts")
+
+        # Forget symbols that are no longer watched
+        for stale in set(last_signal_status) - set(symbols):
+            del last_signal_status[stale]
+
+        # Desktop alert only on local machine if plyer available - one per refresh
+        if PLYER_AVAILABLE and changed:
+            notification.notify(
+                title=f"{changed[0][0]} Signal Changed!" if len(changed) == 1 else f"{len(changed)} Signals Changed!",
+                message="\n".join(f"{s}: {text} | Price ₹{price:.2f}" for s, text, price in changed),
+                timeout=5
+            )
 
         # Display signals table
-        signal_df = pd.DataFrame(summary_data)
+        signal_df = pd.DataFrame({"Stock": symbols, "Price (₹)": prices, "Signal": signals})
+        signal_df = signal_df[has_data].reset_index(drop=True)
         signal_placeholder.subheader(f"📊 Live Signals (Updated: {datetime.now().strftime('%H:%M:%S')})")
-        signal_placeholder.dataframe(signal_df, use_container_width=True)
-
-        # Sleep till next refresh
-        time.sleep(refresh_sec)
+        signal_placeholder.dataframe(
+            signal_df.style.format({"Price (₹)": "₹{:.2f}", "Signal": signal_label}),
+            use_container_width=True
+        )
 
     except Exception as e:
         st.error(f"⚠️ Error: {e}")
-        time.sleep(refresh_sec)
+
+live_dashboard()